@@ -7,7 +7,7 @@ use std::path::PathBuf;
 #[command(
     version,
     about = "Design Parity Checker - Compare implementations against design references",
-    long_about = "Design Parity Checker (DPC)\n\nModes:\n- compare: measure similarity between a reference (Figma/URL/image) and an implementation (Figma/URL/image).\n- generate-code: create HTML/Tailwind from a single input via a screenshot-to-code backend (or mock).\n- quality: experimental reference-free scoring.\n\nUse --help on any subcommand for details."
+    long_about = "Design Parity Checker (DPC)\n\nModes:\n- compare: measure similarity between a reference (Figma/URL/image) and an implementation (Figma/URL/image).\n- compare-batch: run many compares in one process, one JSON request line per compare.\n- generate-code: create HTML/Tailwind from a single input via a screenshot-to-code backend (or mock).\n- quality: experimental reference-free scoring.\n\nUse --help on any subcommand for details."
 )]
 #[command(propagate_version = true)]
 pub struct Cli {
@@ -153,6 +153,9 @@ pub enum Commands {
         context: Option<String>,
     },
 
+    /// Run compares for JSON-encoded flag lists read from stdin, one per line
+    CompareBatch,
+
     /// Generate HTML/Tailwind code from a design input
     GenerateCode {
         #[arg(long, help = "Input resource (Figma URL, web URL, or local image)")]
@@ -375,6 +378,12 @@ mod tests {
         }
     }
 
+    #[test]
+    fn compare_batch_command_parses() {
+        let cli = Cli::parse_from(["dpc", "compare-batch"]);
+        assert!(matches!(cli.command, Commands::CompareBatch));
+    }
+
     #[test]
     fn quality_command_sets_verbose() {
         let cli = Cli::parse_from([
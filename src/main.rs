@@ -5,10 +5,15 @@ mod pipeline;
 mod progress;
 mod settings;
 
+use std::io::BufRead;
+use std::path::PathBuf;
 use std::process::ExitCode;
 
-use cli::Commands;
+use clap::Parser;
+use cli::{Cli, Commands, OutputFormat};
 use commands::{run_compare, run_generate_code, run_quality};
+use dpc_lib::DpcError;
+use formatting::render_error;
 
 #[tokio::main]
 async fn main() -> ExitCode {
@@ -20,57 +25,8 @@ async fn run() -> ExitCode {
     let args = cli::parse();
 
     match args.command {
-        Commands::Compare {
-            r#ref,
-            r#impl,
-            ref_type,
-            impl_type,
-            viewport,
-            threshold,
-            metrics,
-            format,
-            output,
-            keep_artifacts,
-            ignore_selectors,
-            ignore_regions,
-            artifacts_dir,
-            nav_timeout,
-            network_idle_timeout,
-            process_timeout,
-            pixel_align,
-            pixel_align_max_shift,
-            pixel_align_downscale,
-            semantic_analysis,
-            context,
-        } => {
-            run_compare(
-                &raw_args,
-                args.config,
-                args.verbose,
-                r#ref,
-                r#impl,
-                ref_type,
-                impl_type,
-                viewport,
-                threshold,
-                metrics,
-                format,
-                output,
-                keep_artifacts,
-                ignore_selectors,
-                ignore_regions,
-                artifacts_dir,
-                nav_timeout,
-                network_idle_timeout,
-                process_timeout,
-                pixel_align,
-                pixel_align_max_shift,
-                pixel_align_downscale,
-                semantic_analysis,
-                context,
-            )
-            .await
-        }
+        Commands::Compare { .. } => compare(&raw_args, args).await,
+        Commands::CompareBatch => run_compare_batch(args.config, args.verbose).await,
         Commands::GenerateCode {
             input,
             input_type,
@@ -113,3 +69,99 @@ async fn run() -> ExitCode {
         }
     }
 }
+
+async fn compare(raw_args: &[String], args: Cli) -> ExitCode {
+    let Commands::Compare {
+        r#ref,
+        r#impl,
+        ref_type,
+        impl_type,
+        viewport,
+        threshold,
+        metrics,
+        format,
+        output,
+        keep_artifacts,
+        ignore_selectors,
+        ignore_regions,
+        artifacts_dir,
+        nav_timeout,
+        network_idle_timeout,
+        process_timeout,
+        pixel_align,
+        pixel_align_max_shift,
+        pixel_align_downscale,
+        semantic_analysis,
+        context,
+    } = args.command
+    else {
+        unreachable!("compare called for another subcommand");
+    };
+    run_compare(
+        raw_args,
+        args.config,
+        args.verbose,
+        r#ref,
+        r#impl,
+        ref_type,
+        impl_type,
+        viewport,
+        threshold,
+        metrics,
+        format,
+        output,
+        keep_artifacts,
+        ignore_selectors,
+        ignore_regions,
+        artifacts_dir,
+        nav_timeout,
+        network_idle_timeout,
+        process_timeout,
+        pixel_align,
+        pixel_align_max_shift,
+        pixel_align_downscale,
+        semantic_analysis,
+        context,
+    )
+    .await
+}
+
+/// Run many compares in one process: each stdin line is a JSON array of
+/// `compare` flags, answered by one JSON result line on stdout.
+async fn run_compare_batch(config: Option<PathBuf>, verbose: bool) -> ExitCode {
+    for line in std::io::stdin().lock().lines() {
+        let Ok(line) = line else { break };
+        if line.trim().is_empty() {
+            continue;
+        }
+        let flags: Vec<String> = match serde_json::from_str(&line) {
+            Ok(flags) => flags,
+            Err(err) => {
+                render_error(
+                    DpcError::Config(format!("Invalid batch request: {err}")),
+                    OutputFormat::Json,
+                    None,
+                );
+                continue;
+            }
+        };
+        let mut raw_args = vec!["dpc".to_string(), "compare".to_string()];
+        raw_args.extend(flags);
+        let mut args = match Cli::try_parse_from(&raw_args) {
+            Ok(args) => args,
+            Err(err) => {
+                render_error(DpcError::Config(err.to_string()), OutputFormat::Json, None);
+                continue;
+            }
+        };
+        // Every request must answer with exactly one JSON line on stdout.
+        if let Commands::Compare { format, output, .. } = &mut args.command {
+            *format = OutputFormat::Json;
+            *output = None;
+        }
+        args.config = args.config.or_else(|| config.clone());
+        args.verbose |= verbose;
+        compare(&raw_args, args).await;
+    }
+    ExitCode::SUCCESS
+}
@@ -1,15 +1,49 @@
-from PIL import Image
+import struct
+import zlib
+from pathlib import Path
 
-# Create a reference image (100x100 red square)
-ref = Image.new('RGB', (100, 100), color='red')
-ref.save('test_assets/ref.png')
 
-# Create an identical implementation
-impl_identical = Image.new('RGB', (100, 100), color='red')
-impl_identical.save('test_assets/impl_identical.png')
+def png_chunk(kind, payload):
+    return (
+        struct.pack('>I', len(payload))
+        + kind
+        + payload
+        + struct.pack('>I', zlib.crc32(kind + payload))
+    )
 
-# Create a slightly different implementation (blue instead of red)
-impl_different = Image.new('RGB', (100, 100), color='blue')
-impl_different.save('test_assets/impl_different.png')
 
-print("Created test images in test_assets/")
+def solid_png(width, height, rgb):
+    # 8-bit truecolor, no interlace; every scanline uses filter type 0.
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    scanlines = (b'\x00' + bytes(rgb) * width) * height
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(b'IHDR', header)
+        + png_chunk(b'IDAT', zlib.compress(scanlines, 9))
+        + png_chunk(b'IEND', b'')
+    )
+
+
+# The PNGs are committed; only regenerate the ones that are missing.
+images = {
+    # Reference image (100x100 red square)
+    'test_assets/ref.png': (255, 0, 0),
+    # Identical implementation
+    'test_assets/impl_identical.png': (255, 0, 0),
+    # Slightly different implementation (blue instead of red)
+    'test_assets/impl_different.png': (0, 0, 255),
+}
+missing = [path for path in images if not Path(path).exists()]
+
+# ref.png and impl_identical.png share one encoding.
+encoded = {}
+for path in missing:
+    rgb = images[path]
+    if rgb not in encoded:
+        encoded[rgb] = solid_png(100, 100, rgb)
+    Path(path).write_bytes(encoded[rgb])
+
+if missing:
+    print(f"Created test images: {', '.join(missing)}")
+else:
+    print("Test images already present in test_assets/")
@@ -1,20 +1,61 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import hashlib
 import json
+import os
+import shutil
+import sys
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+encode_meta = json.JSONEncoder(indent=2).encode
+
+# Playwright already disables extensions, background networking and audio in
+# headless mode and runs without the sandbox; these trim what remains for
+# rendering static local HTML.
+LAUNCH_ARGS = ["--disable-dev-shm-usage", "--disable-gpu"]
+
+# Registered on every context so the stylesheet is in place once the document
+# is parsed, without a per-screenshot add_style_tag round-trip.
+FREEZE_MOTION_SCRIPT = """
+(() => {
+  const inject = () => {
+    const style = document.createElement("style");
+    style.textContent =
+      "*{animation:none!important;transition:none!important;" +
+      "caret-color:transparent!important;}";
+    document.head.appendChild(style);
+  };
+  if (document.head) {
+    inject();
+  } else {
+    document.addEventListener("DOMContentLoaded", inject, { once: true });
+  }
+})();
+"""
+
+
+CASE_FILES = frozenset({"meta.json", "ref.html", "impl.html"})
 
 
 def load_cases(src_dir: Path):
-    for case_dir in sorted(src_dir.iterdir()):
-        if not case_dir.is_dir():
-            continue
+    # DirEntry caches the file type from readdir, so one listing per case
+    # replaces an is_dir() plus three exists() stat calls.
+    with os.scandir(src_dir) as entries:
+        case_entries = sorted(
+            (entry for entry in entries if entry.is_dir()), key=lambda e: e.name
+        )
+    for entry in case_entries:
+        with os.scandir(entry.path) as files:
+            if not CASE_FILES <= {f.name for f in files}:
+                continue
+        case_dir = Path(entry.path)
         meta_path = case_dir / "meta.json"
         ref_path = case_dir / "ref.html"
         impl_path = case_dir / "impl.html"
-        if meta_path.exists() and ref_path.exists() and impl_path.exists():
-            yield case_dir, meta_path, ref_path, impl_path
+        yield case_dir, meta_path, ref_path, impl_path
 
 
 def resolve_viewports(meta):
@@ -28,13 +69,255 @@ def resolve_viewports(meta):
     raise ValueError("meta.json missing viewport or viewports")
 
 
-def take_screenshots(page, html_path: Path, out_path: Path):
-    page.goto(html_path.resolve().as_uri(), wait_until="networkidle")
-    page.add_style_tag(
-        content="*{animation:none!important;transition:none!important;}"
+def viewport_key(viewport):
+    clip = viewport.get("clip")
+    return (
+        viewport["width"],
+        viewport["height"],
+        viewport.get("device_scale_factor", 1),
+        tuple(sorted(clip.items())) if clip else None,
     )
-    page.wait_for_timeout(50)
-    page.screenshot(path=str(out_path), full_page=True)
+
+
+def capture_area(viewport):
+    # A clip rect only encodes the region of interest; otherwise the whole
+    # document is captured.
+    if viewport.get("clip"):
+        return {"clip": viewport["clip"]}
+    return {"full_page": True}
+
+
+def viewport_size(viewport):
+    return {"width": viewport["width"], "height": viewport["height"]}
+
+
+def write_if_changed(path: Path, data: bytes):
+    if path.exists() and path.read_bytes() == data:
+        return
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(inputs, outputs):
+    try:
+        newest_input = max(path.stat().st_mtime for path in inputs)
+        oldest_output = min(path.stat().st_mtime for path in outputs)
+    except FileNotFoundError:
+        return False
+    return oldest_output > newest_input
+
+
+async def take_screenshots(page, html_path: Path, shots, options, write, rendered):
+    # Identical HTML at the same viewport renders identically, so shots already
+    # rendered in this run (e.g. a shared ref.html) are copied instead. Our own
+    # renders go first so workers never wait on each other's pending shots.
+    digest = hashlib.blake2b(html_path.read_bytes(), digest_size=16).digest()
+    pending = []
+    copies = []
+    for viewport, out_path in shots:
+        key = (digest, viewport_key(viewport))
+        if key in rendered:
+            copies.append((rendered[key], out_path))
+        else:
+            rendered[key] = asyncio.get_running_loop().create_future()
+            pending.append((viewport, out_path, rendered[key]))
+
+    if pending:
+        try:
+            # Shots are ordered largest viewport first: the page is loaded once
+            # and only resized between captures. Fixtures are static local
+            # files, so "load" already covers every subresource.
+            await page.set_viewport_size(viewport_size(pending[0][0]))
+            await page.goto(html_path.as_uri(), wait_until="load")
+            # Resolves immediately without webfonts, and otherwise waits for
+            # them instead of guessing with a fixed sleep.
+            await page.evaluate("() => document.fonts.ready.then(() => true)")
+            for idx, (viewport, out_path, result) in enumerate(pending):
+                if idx:
+                    await page.set_viewport_size(viewport_size(viewport))
+                data = await page.screenshot(**capture_area(viewport), **options)
+                result.set_result((out_path, write(out_path, data)))
+        except BaseException as exc:
+            for _, _, result in pending:
+                if result.done():
+                    continue
+                # A cancelled run has nobody left to report to. Otherwise the
+                # error is raised here too, so copies waiting on these shots
+                # may see it but none has to.
+                if isinstance(exc, asyncio.CancelledError):
+                    result.cancel()
+                else:
+                    result.set_exception(exc)
+                    result.exception()
+            raise
+
+    for result, out_path in copies:
+        src_path, written = await result
+        await written
+        await asyncio.to_thread(shutil.copyfile, src_path, out_path)
+
+
+async def render_worker(browser, jobs, progress, options, write, rendered):
+    # Each worker owns one context and page on the shared browser and pulls
+    # jobs until it receives a None sentinel.
+    context = await browser.new_context()
+    await context.add_init_script(FREEZE_MOTION_SCRIPT)
+    page = await context.new_page()
+    try:
+        while (job := await jobs.get()) is not None:
+            label, ref_html, impl_html, shots = job
+            await take_screenshots(
+                page,
+                ref_html,
+                [(vp, ref) for vp, ref, _ in shots],
+                options,
+                write,
+                rendered,
+            )
+            await take_screenshots(
+                page,
+                impl_html,
+                [(vp, impl) for vp, _, impl in shots],
+                options,
+                write,
+                rendered,
+            )
+            progress(label)
+    finally:
+        await context.close()
+
+
+async def put_job(jobs, job, workers):
+    # The queue is bounded, so a put waits forever once no worker is left to
+    # drain it. Race the put against the workers and re-raise the first worker
+    # failure instead.
+    put = asyncio.ensure_future(jobs.put(job))
+    waiting = {put, *workers}
+    while True:
+        done, waiting = await asyncio.wait(
+            waiting, return_when=asyncio.FIRST_COMPLETED
+        )
+        for worker in done - {put}:
+            if worker.cancelled() or worker.exception() is not None:
+                put.cancel()
+                worker.result()
+        if put in done:
+            return
+        if waiting == {put}:
+            put.cancel()
+            raise RuntimeError("render workers exited with jobs still queued")
+
+
+async def render_fixtures(src_dir: Path, out_dir: Path, args):
+    if args.format == "jpeg":
+        ext = "jpg"
+        options = {"type": "jpeg", "quality": args.quality}
+    else:
+        ext = "png"
+        options = {"type": "png"}
+
+    # Cases are dispatched as they are discovered; the bounded queue keeps
+    # discovery just ahead of the workers, and the browser is only launched
+    # once there is a job for it.
+    jobs = asyncio.Queue(maxsize=args.workers * 2)
+    rendered_count = 0
+    found = 0
+    skipped = 0
+    # Screenshot bytes are written off the event loop so disk I/O overlaps
+    # with the next navigation.
+    writes = []
+    rendered = {}
+
+    def progress(label):
+        nonlocal rendered_count
+        rendered_count += 1
+        if args.verbose:
+            print(f"[{rendered_count}] Rendered {label}")
+        else:
+            sys.stderr.write(f"\r[{rendered_count}] {label:<40}")
+            sys.stderr.flush()
+
+    def write(path, data):
+        task = asyncio.ensure_future(asyncio.to_thread(path.write_bytes, data))
+        writes.append(task)
+        return task
+
+    async with async_playwright() as p:
+        browser = None
+        workers = []
+        try:
+            # Resolving the source root once makes every case path absolute,
+            # so take_screenshots can build file:// URIs without a resolve().
+            for case_dir, meta_path, ref_html, impl_html in load_cases(
+                src_dir.resolve()
+            ):
+                found += 1
+                meta = json.loads(meta_path.read_bytes())
+                case_id = meta.get("case_id", case_dir.name)
+                is_multi, viewports = resolve_viewports(meta)
+
+                case_out = out_dir / case_id
+                case_out.mkdir(parents=True, exist_ok=True)
+                write_if_changed(
+                    case_out / "meta.json",
+                    (encode_meta(meta) + "\n").encode(),
+                )
+
+                clip = meta.get("clip")
+                shots = []
+                for viewport in sorted(
+                    viewports, key=lambda vp: vp["width"] * vp["height"], reverse=True
+                ):
+                    if clip and "clip" not in viewport:
+                        viewport = {**viewport, "clip": clip}
+                    name = viewport.get("name", "default")
+                    suffix = f".{name}" if is_multi else ""
+                    ref_out = case_out / f"ref{suffix}.{ext}"
+                    impl_out = case_out / f"impl{suffix}.{ext}"
+                    if not args.force and is_up_to_date(
+                        (meta_path, ref_html, impl_html), (ref_out, impl_out)
+                    ):
+                        skipped += 1
+                        continue
+                    shots.append((viewport, ref_out, impl_out))
+                if not shots:
+                    continue
+                if len(workers) < args.workers:
+                    if browser is None:
+                        browser = await p.chromium.launch(args=LAUNCH_ARGS)
+                    workers.append(
+                        asyncio.create_task(
+                            render_worker(
+                                browser, jobs, progress, options, write, rendered
+                            )
+                        )
+                    )
+                await put_job(jobs, (case_id, ref_html, impl_html, shots), workers)
+        except BaseException:
+            # Sentinels would never be consumed by dead workers; stop the rest.
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        else:
+            for _ in workers:
+                await put_job(jobs, None, workers)
+            await asyncio.gather(*workers)
+        finally:
+            if browser is not None:
+                await browser.close()
+    await asyncio.gather(*writes)
+    if rendered_count and not args.verbose:
+        sys.stderr.write("\n")
+    return found, skipped
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def main():
@@ -49,48 +332,44 @@ def main():
         default="test_assets/fixtures",
         help="Directory to write PNGs and meta.json.",
     )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=min(4, os.cpu_count() or 1),
+        help="Number of pages rendering concurrently.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render cases even if their PNGs are newer than the sources.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["png", "jpeg"],
+        default="png",
+        help="Screenshot format; jpeg encodes faster but is lossy.",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=90,
+        help="JPEG quality (only used with --format jpeg).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print one line per rendered case instead of a status line.",
+    )
     args = parser.parse_args()
 
     src_dir = Path(args.src_dir)
     out_dir = Path(args.out_dir)
 
-    cases = list(load_cases(src_dir))
-    if not cases:
+    found, skipped = asyncio.run(render_fixtures(src_dir, out_dir, args))
+    if not found:
         raise SystemExit(f"No cases found in {src_dir}")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        try:
-            total = len(cases)
-            for idx, (case_dir, meta_path, ref_html, impl_html) in enumerate(
-                cases, start=1
-            ):
-                meta = json.loads(meta_path.read_text())
-                case_id = meta.get("case_id", case_dir.name)
-                is_multi, viewports = resolve_viewports(meta)
-
-                case_out = out_dir / case_id
-                case_out.mkdir(parents=True, exist_ok=True)
-                (case_out / "meta.json").write_text(
-                    json.dumps(meta, indent=2) + "\n"
-                )
-                print(f"[{idx}/{total}] Rendering {case_id}...")
-
-                for viewport in viewports:
-                    name = viewport.get("name", "default")
-                    suffix = f".{name}" if is_multi else ""
-                    page = browser.new_page(viewport=viewport)
-                    try:
-                        take_screenshots(
-                            page, ref_html, case_out / f"ref{suffix}.png"
-                        )
-                        take_screenshots(
-                            page, impl_html, case_out / f"impl{suffix}.png"
-                        )
-                    finally:
-                        page.close()
-        finally:
-            browser.close()
+    if skipped:
+        print(f"Skipped {skipped} up-to-date renders (use --force to redo)")
 
 
 if __name__ == "__main__":
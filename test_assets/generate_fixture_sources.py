@@ -1,50 +1,81 @@
 #!/usr/bin/env python3
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, wraps
 from pathlib import Path
-from textwrap import dedent
+from string import Formatter
+from textwrap import dedent, indent
 
 
-def hero_template(**overrides):
-    cfg = {
-        "bg": "#f6f4ef",
-        "ink": "#141414",
-        "accent": "#c66a2b",
-        "title_size": "64px",
-        "title_weight": "700",
-        "title_letter_spacing": "-0.5px",
-        "title_margin": "0 0 16px 0",
-        "title_line_height": "1.05",
-        "subtitle_size": "20px",
-        "subtitle_color": "#3a3a3a",
-        "pill_letter_spacing": "1px",
-        "button_padding": "12px 20px",
-        "button_radius": "999px",
-        "columns": "1.2fr 0.8fr",
-        "gap": "48px",
-        "panel_border": "1px solid #e3ddd2",
-        "panel_radius": "16px",
-        "panel_shadow": "0 20px 40px rgba(0,0,0,0.08)",
-        "panel_display": "block",
-    }
-    cfg.update(overrides)
-    return dedent(
-        f"""
-        <!doctype html>
-        <html lang="en">
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1">
-          <title>Hero</title>
-          <style>
-            :root {{
-              --bg: {cfg["bg"]};
-              --ink: {cfg["ink"]};
-              --accent: {cfg["accent"]};
-            }}
-            * {{ box-sizing: border-box; }}
-            body {{
-              margin: 0;
-              font-family: "Helvetica Neue", Arial, sans-serif;
+def compile_template(source):
+    # Parse the str.format template once; rendering is then a single join of
+    # the literal chunks and looked-up fields instead of a reparse per call.
+    parts = [(literal, field) for literal, field, _, _ in Formatter().parse(source)]
+
+    def render(values):
+        out = []
+        for literal, field in parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+    return render
+
+
+CSS_RESET = (
+    "    * {{ box-sizing: border-box; }}\n"
+    "    body {{\n"
+    "      margin: 0;\n"
+    '      font-family: "Helvetica Neue", Arial, sans-serif;\n'
+)
+
+
+PAGE_HEAD = (
+    "<!doctype html>\n"
+    '<html lang="en">\n'
+    "<head>\n"
+    '  <meta charset="utf-8">\n'
+    '  <meta name="viewport" content="width=device-width, initial-scale=1">\n'
+    "  <title>{}</title>\n"
+    "  <style>\n"
+)
+
+
+def page_source(title, body, root_rules=""):
+    # Every fixture page shares the same head and CSS reset; only the title,
+    # an optional :root block and the remaining styles and markup differ.
+    # Bodies are dedented here once, when the templates are compiled.
+    head = PAGE_HEAD.format(title)
+    return (head + root_rules + CSS_RESET + dedent(body).lstrip("\n")).strip() + "\n"
+
+
+def memoize_template(template):
+    # Many cases reuse the same overrides, so identical calls return the cached
+    # page. Overrides are frozen into a hashable key (lists become tuples).
+    @lru_cache(maxsize=None)
+    def cached(items):
+        return template(**dict(items))
+
+    @wraps(template)
+    def wrapper(**overrides):
+        return cached(
+            frozenset(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in overrides.items()
+            )
+        )
+
+    return wrapper
+
+
+render_hero = compile_template(
+    page_source(
+        "Hero",
+        """
               background: var(--bg);
               color: var(--ink);
             }}
@@ -60,22 +91,22 @@ def hero_template(**overrides):
               width: 100%;
               max-width: 1040px;
               display: grid;
-              grid-template-columns: {cfg["columns"]};
-              gap: {cfg["gap"]};
+              grid-template-columns: {columns};
+              gap: {gap};
               align-items: center;
             }}
             .hero-title {{
-              font-size: {cfg["title_size"]};
-              line-height: {cfg["title_line_height"]};
-              font-weight: {cfg["title_weight"]};
-              margin: {cfg["title_margin"]};
-              letter-spacing: {cfg["title_letter_spacing"]};
+              font-size: {title_size};
+              line-height: {title_line_height};
+              font-weight: {title_weight};
+              margin: {title_margin};
+              letter-spacing: {title_letter_spacing};
             }}
             .hero-subtitle {{
-              font-size: {cfg["subtitle_size"]};
+              font-size: {subtitle_size};
               line-height: 1.5;
               margin: 0 0 24px 0;
-              color: {cfg["subtitle_color"]};
+              color: {subtitle_color};
             }}
             .hero-pill {{
               display: inline-block;
@@ -84,14 +115,14 @@ def hero_template(**overrides):
               background: var(--accent);
               color: white;
               font-size: 12px;
-              letter-spacing: {cfg["pill_letter_spacing"]};
+              letter-spacing: {pill_letter_spacing};
               text-transform: uppercase;
             }}
             .hero-cta {{
               display: inline-flex;
               align-items: center;
-              padding: {cfg["button_padding"]};
-              border-radius: {cfg["button_radius"]};
+              padding: {button_padding};
+              border-radius: {button_radius};
               background: var(--ink);
               color: white;
               border: none;
@@ -99,11 +130,11 @@ def hero_template(**overrides):
               letter-spacing: 0.3px;
             }}
             .panel {{
-              display: {cfg["panel_display"]};
+              display: {panel_display};
               padding: 28px;
-              border-radius: {cfg["panel_radius"]};
-              border: {cfg["panel_border"]};
-              box-shadow: {cfg["panel_shadow"]};
+              border-radius: {panel_radius};
+              border: {panel_border};
+              box-shadow: {panel_shadow};
               background: white;
             }}
             .panel-stat {{
@@ -126,7 +157,7 @@ def hero_template(**overrides):
                 <span class="hero-pill">Spring Release</span>
                 <h1 class="hero-title">Design parity, faster.</h1>
                 <p class="hero-subtitle">
-                  Compare pixel differences and find issues in seconds, not hours.
+                  {subtitle}
                 </p>
                 <button class="hero-cta">Start a review</button>
               </div>
@@ -138,39 +169,54 @@ def hero_template(**overrides):
           </div>
         </body>
         </html>
-        """
-    ).strip() + "\n"
+        """,
+        root_rules=(
+            "    :root {{\n"
+            "      --bg: {bg};\n"
+            "      --ink: {ink};\n"
+            "      --accent: {accent};\n"
+            "    }}\n"
+        ),
+    )
+)
 
 
-def card_template(**overrides):
+HERO_SUBTITLE = "Compare pixel differences and find issues in seconds, not hours."
+
+
+@memoize_template
+def hero_template(**overrides):
     cfg = {
-        "bg": "#f4f7fb",
-        "card_bg": "#ffffff",
-        "border": "1px solid #d6dbe5",
-        "radius": "22px",
-        "padding": "32px",
-        "shadow": "0 18px 40px rgba(15,23,42,0.12)",
-        "title_size": "28px",
-        "body_size": "16px",
-        "badge_letter_spacing": "2px",
-        "badge_bg": "#e2e8f0",
-        "button_padding": "10px 16px",
+        "bg": "#f6f4ef",
+        "ink": "#141414",
+        "accent": "#c66a2b",
+        "title_size": "64px",
+        "title_weight": "700",
+        "title_letter_spacing": "-0.5px",
+        "title_margin": "0 0 16px 0",
+        "title_line_height": "1.05",
+        "subtitle": HERO_SUBTITLE,
+        "subtitle_size": "20px",
+        "subtitle_color": "#3a3a3a",
+        "pill_letter_spacing": "1px",
+        "button_padding": "12px 20px",
+        "button_radius": "999px",
+        "columns": "1.2fr 0.8fr",
+        "gap": "48px",
+        "panel_border": "1px solid #e3ddd2",
+        "panel_radius": "16px",
+        "panel_shadow": "0 20px 40px rgba(0,0,0,0.08)",
+        "panel_display": "block",
     }
     cfg.update(overrides)
-    return dedent(
-        f"""
-        <!doctype html>
-        <html lang="en">
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1">
-          <title>Card</title>
-          <style>
-            * {{ box-sizing: border-box; }}
-            body {{
-              margin: 0;
-              font-family: "Helvetica Neue", Arial, sans-serif;
-              background: {cfg["bg"]};
+    return render_hero(cfg)
+
+
+render_card = compile_template(
+    page_source(
+        "Card",
+        """
+              background: {bg};
               color: #0f172a;
             }}
             .frame {{
@@ -181,35 +227,35 @@ def card_template(**overrides):
             }}
             .card {{
               width: 520px;
-              background: {cfg["card_bg"]};
-              border: {cfg["border"]};
-              border-radius: {cfg["radius"]};
-              padding: {cfg["padding"]};
-              box-shadow: {cfg["shadow"]};
+              background: {card_bg};
+              border: {border};
+              border-radius: {radius};
+              padding: {padding};
+              box-shadow: {shadow};
             }}
             h2 {{
               margin: 0 0 12px 0;
-              font-size: {cfg["title_size"]};
+              font-size: {title_size};
               letter-spacing: -0.3px;
             }}
             p {{
               margin: 0 0 20px 0;
-              font-size: {cfg["body_size"]};
+              font-size: {body_size};
               color: #475569;
             }}
             .badge {{
               display: inline-block;
               padding: 6px 12px;
               border-radius: 999px;
-              background: {cfg["badge_bg"]};
+              background: {badge_bg};
               font-size: 11px;
-              letter-spacing: {cfg["badge_letter_spacing"]};
+              letter-spacing: {badge_letter_spacing};
               text-transform: uppercase;
             }}
             .action {{
               display: inline-flex;
               align-items: center;
-              padding: {cfg["button_padding"]};
+              padding: {button_padding};
               border-radius: 10px;
               border: 1px solid #0f172a;
               background: white;
@@ -229,10 +275,96 @@ def card_template(**overrides):
           </div>
         </body>
         </html>
-        """
-    ).strip() + "\n"
+        """,
+    )
+)
+
 
+@memoize_template
+def card_template(**overrides):
+    cfg = {
+        "bg": "#f4f7fb",
+        "card_bg": "#ffffff",
+        "border": "1px solid #d6dbe5",
+        "radius": "22px",
+        "padding": "32px",
+        "shadow": "0 18px 40px rgba(15,23,42,0.12)",
+        "title_size": "28px",
+        "body_size": "16px",
+        "badge_letter_spacing": "2px",
+        "badge_bg": "#e2e8f0",
+        "button_padding": "10px 16px",
+    }
+    cfg.update(overrides)
+    return render_card(cfg)
 
+
+# The grid markup has always been dedented together with its generated tiles,
+# which leaves the document indented by two spaces, tiles after the first flush
+# left, and an empty line when there are no grid areas. The template below
+# reproduces that layout exactly so existing fixtures stay byte-identical.
+render_grid = compile_template(
+    indent(
+        page_source(
+            "{title}",
+            """
+                  background: {bg};
+                  color: #f8fafc;
+                }}
+                .frame {{
+                  min-height: 100vh;
+                  padding: 56px;
+                }}
+                h1 {{
+                  margin: 0 0 24px 0;
+                  font-size: 32px;
+                }}
+                .grid {{
+                  display: grid;
+                  grid-template-columns: {columns};
+                  gap: {gap};{grid_areas_rule}
+                }}
+                .tile {{
+                  background: {tile_bg};
+                  border: {tile_border};
+                  border-radius: {tile_radius};
+                  padding: 20px;
+                }}
+                .tile h3 {{
+                  margin: 0 0 8px 0;
+                  font-size: 18px;
+                }}
+                .tile p {{
+                  margin: 0;
+                  color: #cbd5f5;
+                }}
+              </style>
+            </head>
+            <body>
+              <div class="frame">
+                <h1>{title}</h1>
+                <div class="grid">
+                  {tiles_html}
+                </div>
+              </div>
+            </body>
+            </html>
+            """,
+        ),
+        "  ",
+    ).lstrip()
+)
+
+
+TILE_HTML = (
+    '<div class="tile" style="order:{order};{area}">'
+    "<h3>Tile {idx}</h3>"
+    "<p>Pixel checks, tokens, and layout hints.</p>"
+    "</div>"
+)
+
+
+@memoize_template
 def grid_template(**overrides):
     cfg = {
         "bg": "#0b0f1a",
@@ -248,104 +380,29 @@ def grid_template(**overrides):
         "tile_count": 6,
     }
     cfg.update(overrides)
-    tiles = []
-    for idx in range(cfg["tile_count"]):
-        order = cfg["order"][idx] if idx < len(cfg["order"]) else idx
-        area = ""
-        if cfg["tile_areas"] and idx < len(cfg["tile_areas"]):
-            area = f' grid-area: {cfg["tile_areas"][idx]};'
-        tiles.append(
-            f'<div class="tile" style="order:{order};{area}">'
-            f"<h3>Tile {idx + 1}</h3>"
-            "<p>Pixel checks, tokens, and layout hints.</p>"
-            "</div>"
+    order = cfg["order"]
+    areas = cfg["tile_areas"] or ()
+    tiles_html = "\n".join(
+        TILE_HTML.format(
+            idx=idx + 1,
+            order=order[idx] if idx < len(order) else idx,
+            area=f" grid-area: {areas[idx]};" if idx < len(areas) else "",
         )
-    tiles_html = "\n      ".join(tiles)
-    grid_areas = ""
+        for idx in range(cfg["tile_count"])
+    )
+    grid_areas_rule = "\n"
     if cfg["grid_areas"]:
-        grid_areas = f"grid-template-areas: {cfg['grid_areas']};"
-    return dedent(
-        f"""
-        <!doctype html>
-        <html lang="en">
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1">
-          <title>{cfg["title"]}</title>
-          <style>
-            * {{ box-sizing: border-box; }}
-            body {{
-              margin: 0;
-              font-family: "Helvetica Neue", Arial, sans-serif;
-              background: {cfg["bg"]};
-              color: #f8fafc;
-            }}
-            .frame {{
-              min-height: 100vh;
-              padding: 56px;
-            }}
-            h1 {{
-              margin: 0 0 24px 0;
-              font-size: 32px;
-            }}
-            .grid {{
-              display: grid;
-              grid-template-columns: {cfg["columns"]};
-              gap: {cfg["gap"]};
-              {grid_areas}
-            }}
-            .tile {{
-              background: {cfg["tile_bg"]};
-              border: {cfg["tile_border"]};
-              border-radius: {cfg["tile_radius"]};
-              padding: 20px;
-            }}
-            .tile h3 {{
-              margin: 0 0 8px 0;
-              font-size: 18px;
-            }}
-            .tile p {{
-              margin: 0;
-              color: #cbd5f5;
-            }}
-          </style>
-        </head>
-        <body>
-          <div class="frame">
-            <h1>{cfg["title"]}</h1>
-            <div class="grid">
-              {tiles_html}
-            </div>
-          </div>
-        </body>
-        </html>
-        """
-    ).strip() + "\n"
+        grid_areas_rule += f"        grid-template-areas: {cfg['grid_areas']};"
+    return render_grid(
+        dict(cfg, tiles_html=tiles_html, grid_areas_rule=grid_areas_rule)
+    )
 
 
-def stats_template(**overrides):
-    cfg = {
-        "bg": "#f8fafc",
-        "align": "center",
-        "title_size": "30px",
-        "aside_border": "1px solid #e2e8f0",
-        "aside_bg": "#ffffff",
-    }
-    cfg.update(overrides)
-    return dedent(
-        f"""
-        <!doctype html>
-        <html lang="en">
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1">
-          <title>Stats</title>
-          <style>
-            * {{ box-sizing: border-box; }}
-            body {{
-              margin: 0;
-              font-family: "Helvetica Neue", Arial, sans-serif;
-              background: {cfg["bg"]};
+render_stats = compile_template(
+    page_source(
+        "Stats",
+        """
+              background: {bg};
               color: #0f172a;
             }}
             .frame {{
@@ -358,7 +415,7 @@ def stats_template(**overrides):
             .layout {{
               display: flex;
               gap: 48px;
-              align-items: {cfg["align"]};
+              align-items: {align};
             }}
             .stats {{
               display: grid;
@@ -372,14 +429,14 @@ def stats_template(**overrides):
             }}
             .stat strong {{
               display: block;
-              font-size: {cfg["title_size"]};
+              font-size: {title_size};
               margin-bottom: 4px;
             }}
             .aside {{
               padding: 28px;
               border-radius: 16px;
-              border: {cfg["aside_border"]};
-              background: {cfg["aside_bg"]};
+              border: {aside_border};
+              background: {aside_bg};
               max-width: 260px;
             }}
           </style>
@@ -400,33 +457,29 @@ def stats_template(**overrides):
           </div>
         </body>
         </html>
-        """
-    ).strip() + "\n"
+        """,
+    )
+)
 
 
-def nav_template(**overrides):
+@memoize_template
+def stats_template(**overrides):
     cfg = {
-        "bg": "#0f172a",
-        "accent": "#38bdf8",
-        "icon_path": "M3 6h18M3 12h18M3 18h18",
-        "mobile_icon_path": None,
+        "bg": "#f8fafc",
+        "align": "center",
+        "title_size": "30px",
+        "aside_border": "1px solid #e2e8f0",
+        "aside_bg": "#ffffff",
     }
     cfg.update(overrides)
-    mobile_icon = cfg["mobile_icon_path"] or cfg["icon_path"]
-    return dedent(
-        f"""
-        <!doctype html>
-        <html lang="en">
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1">
-          <title>Nav</title>
-          <style>
-            * {{ box-sizing: border-box; }}
-            body {{
-              margin: 0;
-              font-family: "Helvetica Neue", Arial, sans-serif;
-              background: {cfg["bg"]};
+    return render_stats(cfg)
+
+
+render_nav = compile_template(
+    page_source(
+        "Nav",
+        """
+              background: {bg};
               color: #f8fafc;
             }}
             header {{
@@ -446,7 +499,7 @@ def nav_template(**overrides):
             .cta {{
               padding: 10px 16px;
               border-radius: 999px;
-              background: {cfg["accent"]};
+              background: {accent};
               color: #0f172a;
               font-weight: 700;
             }}
@@ -470,14 +523,28 @@ def nav_template(**overrides):
             </nav>
             <svg class="mobile-toggle" width="28" height="28" viewBox="0 0 24 24"
               fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round">
-              <path class="desktop-path" d="{cfg["icon_path"]}"></path>
+              <path class="desktop-path" d="{icon_path}"></path>
               <path class="mobile-path" d="{mobile_icon}"></path>
             </svg>
           </header>
         </body>
         </html>
-        """
-    ).strip() + "\n"
+        """,
+    )
+)
+
+
+@memoize_template
+def nav_template(**overrides):
+    cfg = {
+        "bg": "#0f172a",
+        "accent": "#38bdf8",
+        "icon_path": "M3 6h18M3 12h18M3 18h18",
+        "mobile_icon_path": None,
+    }
+    cfg.update(overrides)
+    mobile_icon = cfg["mobile_icon_path"] or cfg["icon_path"]
+    return render_nav(dict(cfg, mobile_icon=mobile_icon))
 
 
 def case_meta(**kwargs):
@@ -495,41 +562,42 @@ DELTA_ORDER = {"tiny": 0, "small": 1, "medium": 2, "large": 3}
 def max_delta_level(mutations):
     if not mutations:
         return None
-    levels = [DELTA_ORDER.get(m.get("delta")) for m in mutations]
-    levels = [lvl for lvl in levels if lvl is not None]
-    return max(levels) if levels else None
+    return max(
+        (DELTA_ORDER[d] for m in mutations if (d := m.get("delta")) in DELTA_ORDER),
+        default=None,
+    )
 
 
-def has_typography_change(mutations):
-    if not mutations:
-        return False
-    typography_props = {
+TYPOGRAPHY_PROPS = frozenset(
+    {
         "font-size",
         "font-weight",
         "line-height",
         "letter-spacing",
         "font-family",
     }
-    return any(m.get("property") in typography_props for m in mutations)
+)
 
 
-def default_assertions(category, complexity, mutations=None):
+def has_typography_change(mutations):
+    if not mutations:
+        return False
+    return any(m.get("property") in TYPOGRAPHY_PROPS for m in mutations)
+
+
+TYPOGRAPHY_SCORE_MAX = {0: 0.9999, 1: 0.999, 2: 0.995, 3: 0.99}
+
+
+@lru_cache(maxsize=None)
+def cached_assertions(category, complexity, typography_level):
     assertions = {}
     if "layout" in category or "spacing" in category or "icon" in category:
         assertions["pixel_regions_min"] = 1
     if "color" in category:
         assertions["color_diffs_min"] = 1
         assertions["color_score_max"] = 0.9995
-    if "typography" in category and has_typography_change(mutations):
-        delta_level = max_delta_level(mutations)
-        if delta_level == 0:
-            assertions["typography_score_max"] = 0.9999
-        elif delta_level == 1:
-            assertions["typography_score_max"] = 0.999
-        elif delta_level == 2:
-            assertions["typography_score_max"] = 0.995
-        elif delta_level == 3:
-            assertions["typography_score_max"] = 0.99
+    if typography_level in TYPOGRAPHY_SCORE_MAX:
+        assertions["typography_score_max"] = TYPOGRAPHY_SCORE_MAX[typography_level]
     if "copy" in category:
         assertions["content_score_max"] = 0.95
     if complexity == "high":
@@ -537,391 +605,342 @@ def default_assertions(category, complexity, mutations=None):
     return assertions
 
 
-def add_case(
-    cases,
-    case_id,
-    title,
-    category,
-    complexity,
-    mutations,
-    expectations,
-    ref_html,
-    impl_html,
-    viewport=None,
-    viewports=None,
-    notes=None,
-    assertions=None,
-    assertions_by_viewport=None,
-):
-    case = {
-        "case_id": case_id,
-        "title": title,
-        "category": category,
-        "complexity": complexity,
-        "mutations": mutations,
-        "expectations": expectations,
-        "assertions": assertions or default_assertions(category, complexity, mutations),
-        "ref_html": ref_html,
-        "impl_html": impl_html,
-    }
-    if viewport:
-        case["viewport"] = viewport
-    if viewports:
-        case["viewports"] = viewports
-    if notes:
-        case["notes"] = notes
-    if assertions_by_viewport:
-        case["assertions_by_viewport"] = assertions_by_viewport
-    cases.append(case)
-
-
-def main():
-    out_dir = Path("test_assets/fixtures_src")
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    base_vp = {"width": 1280, "height": 720, "device_scale_factor": 1}
-    viewports = [
-        {"name": "desktop", "width": 1280, "height": 720, "device_scale_factor": 1},
-        {"name": "mobile", "width": 390, "height": 844, "device_scale_factor": 2},
-    ]
-
-    cases = []
-
-    hero_ref = hero_template()
-    card_ref = card_template()
-    grid_ref = grid_template()
-    stats_ref = stats_template()
-    nav_ref = nav_template()
-
-    # Low complexity: single property deltas.
-    hero_title_sizes = [
-        ("62px", "tiny"),
-        ("60px", "small"),
-        ("58px", "small"),
-        ("56px", "small"),
-        ("54px", "medium"),
-        ("52px", "medium"),
-    ]
-    for idx, (size, delta) in enumerate(hero_title_sizes, 1):
-        add_case(
-            cases,
-            f"t1-hero-title-size-{idx:03d}",
-            f"Hero title size to {size}",
-            ["typography"],
-            "low",
-            [
-                {
-                    "target": ".hero-title",
-                    "property": "font-size",
-                    "from": "64px",
-                    "to": size,
-                    "delta": delta,
-                }
-            ],
-            [{"label": "typography.size", "severity": "low"}],
-            hero_ref,
-            hero_template(title_size=size),
-            viewport=base_vp,
-        )
-
-    hero_title_weights = [("600", "small"), ("500", "medium"), ("800", "small")]
-    for idx, (weight, delta) in enumerate(hero_title_weights, 1):
-        add_case(
-            cases,
-            f"t1-hero-title-weight-{idx:03d}",
-            f"Hero title weight to {weight}",
-            ["typography"],
-            "low",
-            [
-                {
-                    "target": ".hero-title",
-                    "property": "font-weight",
-                    "from": "700",
-                    "to": weight,
-                    "delta": delta,
-                }
-            ],
-            [{"label": "typography.weight", "severity": "low"}],
-            hero_ref,
-            hero_template(title_weight=weight),
-            viewport=base_vp,
-        )
+def default_assertions(category, complexity, mutations=None):
+    typography_level = None
+    if "typography" in category and has_typography_change(mutations):
+        typography_level = max_delta_level(mutations)
+    return dict(
+        cached_assertions(tuple(sorted(category)), complexity, typography_level)
+    )
 
-    subtitle_colors = ["#2d2d2d", "#4b4b4b", "#5a5a5a"]
-    for idx, color in enumerate(subtitle_colors, 1):
-        add_case(
-            cases,
-            f"t1-hero-subtitle-color-{idx:03d}",
-            "Hero subtitle color shift",
-            ["color", "typography"],
-            "low",
-            [
-                {
-                    "target": ".hero-subtitle",
-                    "property": "color",
-                    "from": "#3a3a3a",
-                    "to": color,
-                    "delta": "tiny",
-                }
-            ],
-            [{"label": "color.text", "severity": "low"}],
-            hero_ref,
-            hero_template(subtitle_color=color),
-            viewport=base_vp,
-        )
 
-    button_paddings = ["10px 18px", "12px 24px", "14px 20px", "14px 26px"]
-    for idx, pad in enumerate(button_paddings, 1):
-        add_case(
-            cases,
-            f"t1-hero-cta-padding-{idx:03d}",
-            "Hero CTA padding change",
-            ["spacing", "component"],
-            "low",
-            [
-                {
-                    "target": "button.hero-cta",
-                    "property": "padding",
-                    "from": "12px 20px",
-                    "to": pad,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "spacing.padding", "severity": "medium"}],
-            hero_ref,
-            hero_template(button_padding=pad),
-            viewport=base_vp,
-        )
+@dataclass(slots=True)
+class Case:
+    case_id: str
+    title: str
+    category: list
+    complexity: str
+    mutations: list
+    expectations: list
+    ref_html: str
+    impl_html: str
+    viewport: dict | None = None
+    viewports: list | None = None
+    notes: str | None = None
+    assertions: dict | None = None
+    assertions_by_viewport: dict | None = None
 
-    pill_letter_spacings = ["0.5px", "1.5px", "2px"]
-    for idx, spacing in enumerate(pill_letter_spacings, 1):
-        add_case(
-            cases,
-            f"t1-hero-pill-spacing-{idx:03d}",
-            "Hero pill letter spacing",
-            ["typography"],
-            "low",
-            [
-                {
-                    "target": ".hero-pill",
-                    "property": "letter-spacing",
-                    "from": "1px",
-                    "to": spacing,
-                    "delta": "tiny",
-                }
-            ],
-            [{"label": "typography.letter_spacing", "severity": "low"}],
-            hero_ref,
-            hero_template(pill_letter_spacing=spacing),
-            viewport=base_vp,
-        )
+    def __post_init__(self):
+        if not self.assertions:
+            self.assertions = default_assertions(
+                self.category, self.complexity, self.mutations
+            )
 
-    card_border_colors = ["#c7cdd8", "#bfc6d3", "#aeb7c6", "#d1d7e2"]
-    for idx, color in enumerate(card_border_colors, 1):
-        add_case(
-            cases,
-            f"t1-card-border-color-{idx:03d}",
-            "Card border color change",
-            ["color", "component"],
-            "low",
-            [
-                {
-                    "target": ".card",
-                    "property": "border-color",
-                    "from": "#d6dbe5",
-                    "to": color,
-                    "delta": "tiny",
-                }
-            ],
-            [{"label": "color.stroke", "severity": "low"}],
-            card_ref,
-            card_template(border=f"1px solid {color}"),
-            viewport=base_vp,
-        )
+    def meta(self):
+        fields = {
+            "case_id": self.case_id,
+            "title": self.title,
+            "category": self.category,
+            "complexity": self.complexity,
+            "mutations": self.mutations,
+            "expectations": self.expectations,
+            "assertions": self.assertions,
+        }
+        if self.viewport:
+            fields["viewport"] = self.viewport
+        if self.viewports:
+            fields["viewports"] = self.viewports
+        if self.notes:
+            fields["notes"] = self.notes
+        if self.assertions_by_viewport:
+            fields["assertions_by_viewport"] = self.assertions_by_viewport
+        return case_meta(**fields)
 
-    card_radii = ["18px", "16px", "14px", "26px"]
-    for idx, radius in enumerate(card_radii, 1):
-        add_case(
-            cases,
-            f"t1-card-radius-{idx:03d}",
-            "Card radius change",
-            ["shape", "component"],
-            "low",
-            [
-                {
-                    "target": ".card",
-                    "property": "border-radius",
-                    "from": "22px",
-                    "to": radius,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "shape.radius", "severity": "medium"}],
-            card_ref,
-            card_template(radius=radius),
-            viewport=base_vp,
-        )
 
-    card_paddings = ["28px", "30px", "36px", "40px"]
-    for idx, padding in enumerate(card_paddings, 1):
-        add_case(
-            cases,
-            f"t1-card-padding-{idx:03d}",
-            "Card padding change",
-            ["spacing", "component"],
-            "low",
-            [
-                {
-                    "target": ".card",
-                    "property": "padding",
-                    "from": "32px",
-                    "to": padding,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "spacing.padding", "severity": "medium"}],
-            card_ref,
-            card_template(padding=padding),
-            viewport=base_vp,
-        )
+# (case id prefix, title, category, expectation label, expectation severity,
+#  template, template key, value format, target, property, from, delta, samples)
+# Samples are the new values, or (value, delta) pairs when the delta varies.
+SINGLE_PROP_CASES = [
+    (
+        "t1-hero-title-size",
+        "Hero title size to {}",
+        ["typography"],
+        "typography.size",
+        "low",
+        hero_template,
+        "title_size",
+        "{}",
+        ".hero-title",
+        "font-size",
+        "64px",
+        None,
+        [
+            ("62px", "tiny"),
+            ("60px", "small"),
+            ("58px", "small"),
+            ("56px", "small"),
+            ("54px", "medium"),
+            ("52px", "medium"),
+        ],
+    ),
+    (
+        "t1-hero-title-weight",
+        "Hero title weight to {}",
+        ["typography"],
+        "typography.weight",
+        "low",
+        hero_template,
+        "title_weight",
+        "{}",
+        ".hero-title",
+        "font-weight",
+        "700",
+        None,
+        [("600", "small"), ("500", "medium"), ("800", "small")],
+    ),
+    (
+        "t1-hero-subtitle-color",
+        "Hero subtitle color shift",
+        ["color", "typography"],
+        "color.text",
+        "low",
+        hero_template,
+        "subtitle_color",
+        "{}",
+        ".hero-subtitle",
+        "color",
+        "#3a3a3a",
+        "tiny",
+        ["#2d2d2d", "#4b4b4b", "#5a5a5a"],
+    ),
+    (
+        "t1-hero-cta-padding",
+        "Hero CTA padding change",
+        ["spacing", "component"],
+        "spacing.padding",
+        "medium",
+        hero_template,
+        "button_padding",
+        "{}",
+        "button.hero-cta",
+        "padding",
+        "12px 20px",
+        "small",
+        ["10px 18px", "12px 24px", "14px 20px", "14px 26px"],
+    ),
+    (
+        "t1-hero-pill-spacing",
+        "Hero pill letter spacing",
+        ["typography"],
+        "typography.letter_spacing",
+        "low",
+        hero_template,
+        "pill_letter_spacing",
+        "{}",
+        ".hero-pill",
+        "letter-spacing",
+        "1px",
+        "tiny",
+        ["0.5px", "1.5px", "2px"],
+    ),
+    (
+        "t1-card-border-color",
+        "Card border color change",
+        ["color", "component"],
+        "color.stroke",
+        "low",
+        card_template,
+        "border",
+        "1px solid {}",
+        ".card",
+        "border-color",
+        "#d6dbe5",
+        "tiny",
+        ["#c7cdd8", "#bfc6d3", "#aeb7c6", "#d1d7e2"],
+    ),
+    (
+        "t1-card-radius",
+        "Card radius change",
+        ["shape", "component"],
+        "shape.radius",
+        "medium",
+        card_template,
+        "radius",
+        "{}",
+        ".card",
+        "border-radius",
+        "22px",
+        "small",
+        ["18px", "16px", "14px", "26px"],
+    ),
+    (
+        "t1-card-padding",
+        "Card padding change",
+        ["spacing", "component"],
+        "spacing.padding",
+        "medium",
+        card_template,
+        "padding",
+        "{}",
+        ".card",
+        "padding",
+        "32px",
+        "small",
+        ["28px", "30px", "36px", "40px"],
+    ),
+    (
+        "t1-card-body-size",
+        "Card body text size change",
+        ["typography"],
+        "typography.size",
+        "low",
+        card_template,
+        "body_size",
+        "{}",
+        ".card p",
+        "font-size",
+        "16px",
+        "tiny",
+        ["15px", "17px", "18px", "14px"],
+    ),
+    (
+        "t1-card-badge-spacing",
+        "Badge letter spacing change",
+        ["typography"],
+        "typography.letter_spacing",
+        "low",
+        card_template,
+        "badge_letter_spacing",
+        "{}",
+        ".badge",
+        "letter-spacing",
+        "2px",
+        "tiny",
+        ["1px", "1.5px", "2.5px"],
+    ),
+    (
+        "t1-stats-title-size",
+        "Stats title size change",
+        ["typography"],
+        "typography.size",
+        "low",
+        stats_template,
+        "title_size",
+        "{}",
+        ".stat strong",
+        "font-size",
+        "30px",
+        "small",
+        ["28px", "26px", "32px"],
+    ),
+    (
+        "t1-nav-accent",
+        "Nav CTA accent color shift",
+        ["color"],
+        "color.accent",
+        "low",
+        nav_template,
+        "accent",
+        "{}",
+        ".cta",
+        "background",
+        "#38bdf8",
+        "small",
+        ["#7dd3fc", "#22d3ee", "#fbbf24"],
+    ),
+    (
+        "t1-grid-gap",
+        "Grid gap change",
+        ["spacing", "layout"],
+        "spacing.gap",
+        "medium",
+        grid_template,
+        "gap",
+        "{}",
+        ".grid",
+        "gap",
+        "20px",
+        "small",
+        ["16px", "24px", "28px", "32px"],
+    ),
+    (
+        "t1-grid-radius",
+        "Grid tile radius change",
+        ["shape", "component"],
+        "shape.radius",
+        "medium",
+        grid_template,
+        "tile_radius",
+        "{}",
+        ".tile",
+        "border-radius",
+        "18px",
+        "small",
+        ["14px", "20px", "24px"],
+    ),
+]
 
-    body_sizes = ["15px", "17px", "18px", "14px"]
-    for idx, size in enumerate(body_sizes, 1):
-        add_case(
-            cases,
-            f"t1-card-body-size-{idx:03d}",
-            "Card body text size change",
-            ["typography"],
-            "low",
-            [
-                {
-                    "target": ".card p",
-                    "property": "font-size",
-                    "from": "16px",
-                    "to": size,
-                    "delta": "tiny",
-                }
-            ],
-            [{"label": "typography.size", "severity": "low"}],
-            card_ref,
-            card_template(body_size=size),
-            viewport=base_vp,
-        )
 
-    badge_spacings = ["1px", "1.5px", "2.5px"]
-    for idx, spacing in enumerate(badge_spacings, 1):
-        add_case(
-            cases,
-            f"t1-card-badge-spacing-{idx:03d}",
-            "Badge letter spacing change",
-            ["typography"],
+def single_prop_cases(spec, viewport):
+    (
+        prefix,
+        title,
+        category,
+        label,
+        severity,
+        template,
+        key,
+        value_format,
+        target,
+        prop,
+        from_value,
+        delta,
+        samples,
+    ) = spec
+    ref_html = template()
+    expectations = [{"label": label, "severity": severity}]
+    for idx, sample in enumerate(samples, 1):
+        to, sample_delta = sample if isinstance(sample, tuple) else (sample, delta)
+        yield Case(
+            f"{prefix}-{idx:03d}",
+            title.format(to),
+            category,
             "low",
             [
                 {
-                    "target": ".badge",
-                    "property": "letter-spacing",
-                    "from": "2px",
-                    "to": spacing,
-                    "delta": "tiny",
+                    "target": target,
+                    "property": prop,
+                    "from": from_value,
+                    "to": to,
+                    "delta": sample_delta,
                 }
             ],
-            [{"label": "typography.letter_spacing", "severity": "low"}],
-            card_ref,
-            card_template(badge_letter_spacing=spacing),
-            viewport=base_vp,
+            expectations,
+            ref_html,
+            template(**{key: value_format.format(to)}),
+            viewport=viewport,
         )
 
-    stats_title_sizes = ["28px", "26px", "32px"]
-    for idx, size in enumerate(stats_title_sizes, 1):
-        add_case(
-            cases,
-            f"t1-stats-title-size-{idx:03d}",
-            "Stats title size change",
-            ["typography"],
-            "low",
-            [
-                {
-                    "target": ".stat strong",
-                    "property": "font-size",
-                    "from": "30px",
-                    "to": size,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "typography.size", "severity": "low"}],
-            stats_ref,
-            stats_template(title_size=size),
-            viewport=base_vp,
-        )
 
-    nav_accents = ["#7dd3fc", "#22d3ee", "#fbbf24"]
-    for idx, color in enumerate(nav_accents, 1):
-        add_case(
-            cases,
-            f"t1-nav-accent-{idx:03d}",
-            "Nav CTA accent color shift",
-            ["color"],
-            "low",
-            [
-                {
-                    "target": ".cta",
-                    "property": "background",
-                    "from": "#38bdf8",
-                    "to": color,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "color.accent", "severity": "low"}],
-            nav_ref,
-            nav_template(accent=color),
-            viewport=base_vp,
-        )
+def iter_cases():
+    base_vp = {"width": 1280, "height": 720, "device_scale_factor": 1}
+    viewports = [
+        {"name": "desktop", "width": 1280, "height": 720, "device_scale_factor": 1},
+        {"name": "mobile", "width": 390, "height": 844, "device_scale_factor": 2},
+    ]
 
-    grid_gaps = ["16px", "24px", "28px", "32px"]
-    for idx, gap in enumerate(grid_gaps, 1):
-        add_case(
-            cases,
-            f"t1-grid-gap-{idx:03d}",
-            "Grid gap change",
-            ["spacing", "layout"],
-            "low",
-            [
-                {
-                    "target": ".grid",
-                    "property": "gap",
-                    "from": "20px",
-                    "to": gap,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "spacing.gap", "severity": "medium"}],
-            grid_ref,
-            grid_template(gap=gap),
-            viewport=base_vp,
-        )
+    hero_ref = sys.intern(hero_template())
+    card_ref = sys.intern(card_template())
+    grid_ref = sys.intern(grid_template())
+    stats_ref = sys.intern(stats_template())
+    nav_ref = sys.intern(nav_template())
+    # Copy variants only swap the subtitle, so they splice it into the
+    # reference page instead of rendering or scanning the whole page again.
+    hero_before_subtitle, hero_after_subtitle = hero_ref.split(HERO_SUBTITLE)
 
-    grid_radii = ["14px", "20px", "24px"]
-    for idx, radius in enumerate(grid_radii, 1):
-        add_case(
-            cases,
-            f"t1-grid-radius-{idx:03d}",
-            "Grid tile radius change",
-            ["shape", "component"],
-            "low",
-            [
-                {
-                    "target": ".tile",
-                    "property": "border-radius",
-                    "from": "18px",
-                    "to": radius,
-                    "delta": "small",
-                }
-            ],
-            [{"label": "shape.radius", "severity": "medium"}],
-            grid_ref,
-            grid_template(tile_radius=radius),
-            viewport=base_vp,
-        )
+    # Low complexity: single property deltas.
+    for spec in SINGLE_PROP_CASES:
+        yield from single_prop_cases(spec, base_vp)
 
     # Medium complexity: multiple deltas.
     hero_combo = [
@@ -933,8 +952,7 @@ def main():
         ("66px", "0 0 18px 0"),
     ]
     for idx, (size, margin) in enumerate(hero_combo, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-hero-size-margin-{idx:03d}",
             "Hero title size + margin change",
             ["typography", "spacing"],
@@ -968,8 +986,7 @@ def main():
         ("#f5f3ff", "#8b5cf6"),
     ]
     for idx, (bg, accent) in enumerate(palette_pairs, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-hero-palette-{idx:03d}",
             "Hero background + accent shift",
             ["color"],
@@ -1006,8 +1023,7 @@ def main():
         ("0 22px 44px rgba(15,23,42,0.22)", "#d1d7e2"),
     ]
     for idx, (shadow, border_color) in enumerate(card_shadow_border, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-card-shadow-border-{idx:03d}",
             "Card shadow + border change",
             ["color", "component"],
@@ -1043,8 +1059,7 @@ def main():
         ("stretch", "#f5f3ff", "1px solid #ddd6fe"),
     ]
     for idx, (align, aside_bg, aside_border) in enumerate(stats_align_aside, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-stats-align-aside-{idx:03d}",
             "Stats alignment + aside panel change",
             ["alignment", "layout"],
@@ -1074,8 +1089,7 @@ def main():
     grid_columns = ["repeat(2, 1fr)", "repeat(4, 1fr)", "repeat(3, 1fr)", "repeat(2, 1fr)"]
     grid_gaps_combo = ["28px", "24px", "16px", "32px"]
     for idx, (cols, gap) in enumerate(zip(grid_columns, grid_gaps_combo), 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-grid-cols-gap-{idx:03d}",
             "Grid columns + gap change",
             ["layout", "spacing"],
@@ -1109,8 +1123,7 @@ def main():
         ("M3 12h18", "#f472b6"),
     ]
     for idx, (path, color) in enumerate(nav_icon_accent, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-nav-icon-accent-{idx:03d}",
             "Nav icon + accent change",
             ["icon", "color"],
@@ -1144,8 +1157,7 @@ def main():
         "Map diffs to tokens and components fast.",
     ]
     for idx, text in enumerate(copy_variants, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-hero-copy-{idx:03d}",
             "Hero subtitle copy change",
             ["copy"],
@@ -1154,17 +1166,14 @@ def main():
                 {
                     "target": ".hero-subtitle",
                     "property": "text",
-                    "from": "Compare pixel differences and find issues in seconds, not hours.",
+                    "from": HERO_SUBTITLE,
                     "to": text,
                     "delta": "medium",
                 }
             ],
             [{"label": "copy.mismatch", "severity": "medium"}],
             hero_ref,
-            hero_template().replace(
-                "Compare pixel differences and find issues in seconds, not hours.",
-                text,
-            ),
+            hero_before_subtitle + text + hero_after_subtitle,
             viewport=base_vp,
         )
 
@@ -1175,8 +1184,7 @@ def main():
         ("30px", "16px"),
     ]
     for idx, (padding, radius) in enumerate(card_padding_radius, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-card-padding-radius-{idx:03d}",
             "Card padding + radius change",
             ["spacing", "shape"],
@@ -1210,8 +1218,7 @@ def main():
         ("#ecfeff", "31px"),
     ]
     for idx, (bg, title_size) in enumerate(stats_bg_title, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t2-stats-bg-title-{idx:03d}",
             "Stats background + title size",
             ["color", "typography"],
@@ -1253,8 +1260,7 @@ def main():
             f'"{ordered_names[0]} {ordered_names[1]} {ordered_names[2]}" '
             f'"{ordered_names[3]} {ordered_names[4]} {ordered_names[5]}"'
         )
-        add_case(
-            cases,
+        yield Case(
             f"t3-grid-reorder-{idx:03d}",
             "Grid tile reorder",
             ["layout", "alignment"],
@@ -1276,8 +1282,7 @@ def main():
 
     column_sets = ["repeat(2, 1fr)", "repeat(4, 1fr)", "repeat(1, 1fr)", "repeat(5, 1fr)"]
     for idx, cols in enumerate(column_sets, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t3-grid-columns-{idx:03d}",
             "Grid column count change",
             ["layout", "spacing"],
@@ -1299,8 +1304,7 @@ def main():
 
     missing_tiles = [5, 4, 3]
     for idx, count in enumerate(missing_tiles, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t3-grid-missing-{idx:03d}",
             "Missing grid tiles",
             ["layout", "component"],
@@ -1329,8 +1333,7 @@ def main():
             "delta": "small",
         }
     ]
-    add_case(
-        cases,
+    yield Case(
         "t3-multi-viewport-001",
         "Mobile nav icon mismatch",
         ["icon", "layout"],
@@ -1367,8 +1370,7 @@ def main():
                 "delta": "small",
             }
         ]
-        add_case(
-            cases,
+        yield Case(
             f"t3-nav-multi-viewport-{idx:03d}",
             "Mobile nav icon mismatch",
             ["icon", "layout"],
@@ -1396,8 +1398,7 @@ def main():
         ("1fr", "24px", "0 20px 32px rgba(0,0,0,0.16)"),
     ]
     for idx, (cols, gap, shadow) in enumerate(hero_layouts, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t3-hero-layout-{idx:03d}",
             "Hero layout structure change",
             ["layout", "spacing"],
@@ -1437,8 +1438,7 @@ def main():
         ("none", "Panel collapsed"),
     ]
     for idx, (display, title) in enumerate(hero_panel_hidden, 1):
-        add_case(
-            cases,
+        yield Case(
             f"t3-hero-panel-hidden-{idx:03d}",
             title,
             ["layout", "component"],
@@ -1458,14 +1458,59 @@ def main():
             viewport=base_vp,
         )
 
-    for case in cases:
-        case_id = case["case_id"]
-        case_dir = out_dir / case_id
-        case_dir.mkdir(parents=True, exist_ok=True)
-        (case_dir / "ref.html").write_text(case.pop("ref_html"))
-        (case_dir / "impl.html").write_text(case.pop("impl_html"))
-        meta = case_meta(**case)
-        (case_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+def replace_file(path: Path, text):
+    # Files are replaced rather than rewritten in place, so hardlinks left by a
+    # previous run are never written through.
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def link_file(first: Path, path: Path, text):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        os.link(first, tmp)
+    except OSError:
+        replace_file(path, text)
+    else:
+        os.replace(tmp, path)
+
+
+def write_case(case_dir: Path, files):
+    case_dir.mkdir(parents=True, exist_ok=True)
+    for name, text in files:
+        replace_file(case_dir / name, text)
+
+
+def main():
+    out_dir = Path("test_assets/fixtures_src")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Most cases share one of a few reference pages, so each distinct page is
+    # written once and later copies are hardlinked to that first file. Writes
+    # are spread over a thread pool as cases are generated; links wait until
+    # every first copy exists.
+    written = {}
+    links = []
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        pending = []
+        for case in iter_cases():
+            case_dir = out_dir / case.case_id
+            files = [("meta.json", json.dumps(case.meta(), indent=2) + "\n")]
+            pages = (("ref.html", case.ref_html), ("impl.html", case.impl_html))
+            for name, html in pages:
+                first = written.get(html)
+                if first is None:
+                    written[html] = case_dir / name
+                    files.append((name, html))
+                else:
+                    links.append((first, case_dir / name, html))
+            pending.append(pool.submit(write_case, case_dir, files))
+        for future in pending:
+            future.result()
+        for future in [pool.submit(link_file, *link) for link in links]:
+            future.result()
 
 
 if __name__ == "__main__":
@@ -1,72 +1,123 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
 import json
+import os
+import re
 import shlex
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timezone
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps_line(obj):
+        return orjson.dumps(obj) + b"\n"
+
+else:
+    loads = json.loads
+
+    def dumps_line(obj):
+        return json.dumps(obj).encode() + b"\n"
+
 
 def load_cases(fixtures_dir: Path):
-    for case_dir in sorted(fixtures_dir.iterdir()):
-        if not case_dir.is_dir():
-            continue
+    with os.scandir(fixtures_dir) as entries:
+        case_entries = sorted(
+            (entry for entry in entries if entry.is_dir()), key=lambda e: e.name
+        )
+    for entry in case_entries:
+        case_dir = Path(entry.path)
         meta_path = case_dir / "meta.json"
         if not meta_path.exists():
             continue
         yield case_dir, meta_path
 
 
+def fixture_image(case_dir: Path, stem):
+    # generate_fixture_images.py writes PNG by default and JPEG with --format jpeg.
+    # Switching formats leaves the other one behind, so use the newer render.
+    found = []
+    for path in (case_dir / f"{stem}.png", case_dir / f"{stem}.jpg"):
+        try:
+            found.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:
+            pass
+    if not found:
+        return case_dir / f"{stem}.png"
+    return max(found)[1]
+
+
 def parse_cmd(cmd_str):
     return shlex.split(cmd_str)
 
 
+JSON_TOKENS = re.compile(r'["{}]')
+
+
 def extract_json(text):
     if not text:
         return None
     try:
-        return json.loads(text)
+        return loads(text)
     except json.JSONDecodeError:
         pass
-    indices = [idx for idx, ch in enumerate(text) if ch == "{"]
-    for idx in reversed(indices):
-        chunk = text[idx:].strip()
-        try:
-            return json.loads(chunk)
-        except json.JSONDecodeError:
-            continue
+    # Logs may precede the payload, so the payload is the object that closes at
+    # the end of the text. One backward pass over braces and quotes finds the
+    # brace that opens it, and only that slice is parsed.
+    text = text.rstrip()
+    if not text.endswith("}"):
+        return None
+    depth = 0
+    in_string = False
+    for match in reversed(list(JSON_TOKENS.finditer(text))):
+        pos = match.start()
+        ch = text[pos]
+        if ch == '"':
+            start = pos
+            while start and text[start - 1] == "\\":
+                start -= 1
+            if (pos - start) % 2 == 0:
+                in_string = not in_string
+        elif not in_string:
+            depth += 1 if ch == "}" else -1
+            if depth == 0:
+                try:
+                    return loads(text[pos:])
+                except json.JSONDecodeError:
+                    return None
     return None
 
 
-def run_compare(
-    cmd,
-    ref_path,
-    impl_path,
-    threshold=None,
-    ref_type=None,
-    impl_type=None,
-    viewport=None,
-):
-    compare_cmd = list(cmd)
-    compare_cmd += [
-        "compare",
-        "--ref",
-        str(ref_path),
-        "--impl",
-        str(impl_path),
-        "--format",
-        "json",
-    ]
-    if ref_type:
-        compare_cmd += ["--ref-type", ref_type]
-    if impl_type:
-        compare_cmd += ["--impl-type", impl_type]
-    if viewport:
-        compare_cmd += ["--viewport", viewport]
+def compare_options(threshold=None, input_type=None):
+    # Flags shared by every comparison in a run, built once in main().
+    options = ["--format", "json"]
+    if input_type:
+        options += ["--ref-type", input_type, "--impl-type", input_type]
     if threshold is not None:
-        compare_cmd += ["--threshold", str(threshold)]
+        options += ["--threshold", str(threshold)]
+    return tuple(options)
+
+
+def compare_flags(options, ref_path, impl_path, viewport=None):
+    flags = ["--ref", str(ref_path), "--impl", str(impl_path), *options]
+    if viewport:
+        flags += ["--viewport", viewport]
+    return flags
+
+
+def run_compare(compare_cmd, options, ref_path, impl_path, viewport=None):
     result = subprocess.run(
-        compare_cmd,
+        [*compare_cmd, *compare_flags(options, ref_path, impl_path, viewport)],
         capture_output=True,
         text=True,
     )
@@ -77,91 +128,145 @@ def run_compare(
     return result.returncode, payload, result.stderr.strip()
 
 
-def get_metric(payload, key):
-    metrics = payload.get("metrics") if payload else None
-    if not metrics:
-        return None
-    return metrics.get(key)
+def supports_batch(cmd):
+    result = subprocess.run(
+        [*cmd, "compare-batch", "--help"],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0
+
+
+def drain_lines(stream, lines):
+    for line in stream:
+        lines.append(line)
+
+
+class BatchCompare:
+    # One long-lived `dpc compare-batch` child per worker thread: requests are
+    # JSON arrays of compare flags on stdin, answered by one JSON line each.
+    def __init__(self, cmd, options):
+        self.cmd = [*cmd, "compare-batch"]
+        self.options = options
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.procs = []
+        # Children must not outlive the run, even when it is interrupted.
+        atexit.register(self.close)
+
+    def process(self):
+        proc = getattr(self.local, "proc", None)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+            # stderr is drained in the background so a chatty child never
+            # blocks on a full pipe; each request takes what arrived meanwhile.
+            stderr = []
+            drain = threading.Thread(
+                target=drain_lines, args=(proc.stderr, stderr), daemon=True
+            )
+            drain.start()
+            self.local.proc = proc
+            self.local.stderr = stderr
+            self.local.drain = drain
+            with self.lock:
+                self.procs.append(proc)
+        return proc
+
+    def __call__(self, ref_path, impl_path, viewport=None):
+        flags = compare_flags(self.options, ref_path, impl_path, viewport)
+        proc = self.process()
+        stderr = self.local.stderr
+        del stderr[:]
+        request = json.dumps(flags)
+        try:
+            proc.stdin.write(request + "\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+        except BrokenPipeError:
+            line = ""
+        if not line:
+            code = proc.wait()
+            self.local.drain.join()
+            message = "".join(stderr).strip()
+            return code, None, message or "dpc compare-batch exited early"
+        message = "".join(stderr).strip()
+        # compare-batch answers with exactly one JSON line, so no log scraping.
+        try:
+            return 0, loads(line), message
+        except json.JSONDecodeError:
+            message = f"unexpected compare-batch output: {line.strip()} {message}"
+            return proc.poll(), None, message.strip()
+
+    def close(self):
+        for proc in self.procs:
+            # A child that already exited still holds its end of the pipe.
+            if not proc.stdin.closed:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            proc.wait()
+
+
+# (assertion key, metric, list field, message label): fails when the metric
+# reports fewer entries than the assertion's minimum.
+COUNT_CHECKS = (
+    ("pixel_regions_min", "pixel", "diffRegions", "pixel diff regions"),
+    ("color_diffs_min", "color", "diffs", "color diffs"),
+)
+
+# (assertion key, metric, message label): fails when the metric's score is
+# above the assertion's maximum.
+SCORE_CHECKS = (
+    ("color_score_max", "color", "color score"),
+    ("typography_score_max", "typography", "typography score"),
+    ("layout_score_max", "layout", "layout score"),
+    ("content_score_max", "content", "content score"),
+)
 
 
 def check_assertions(case_id, payload, assertions, viewport_name=None):
-    failures = []
+    prefix = format_case_id(case_id, viewport_name)
     if not payload:
-        return [format_case_id(case_id, viewport_name) + ": missing compare payload"]
+        return [prefix + ": missing compare payload"]
     if payload.get("mode") == "error":
         msg = payload.get("error", {}).get("message", "unknown error")
-        return [format_case_id(case_id, viewport_name) + f": error payload: {msg}"]
+        return [prefix + f": error payload: {msg}"]
     if payload.get("mode") != "compare":
-        return [
-            format_case_id(case_id, viewport_name)
-            + f": unexpected mode {payload.get('mode')}"
-        ]
-
-    similarity = payload.get("similarity")
-    pixel = get_metric(payload, "pixel")
-    color = get_metric(payload, "color")
-    typography = get_metric(payload, "typography")
-    layout = get_metric(payload, "layout")
-    content = get_metric(payload, "content")
-
-    if "pixel_regions_min" in assertions:
-        diff_regions = pixel.get("diffRegions") if pixel else None
-        if diff_regions is not None:
-            count = len(diff_regions)
-            if count < assertions["pixel_regions_min"]:
-                failures.append(
-                    format_case_id(case_id, viewport_name)
-                    + f": pixel diff regions {count} < {assertions['pixel_regions_min']}"
-                )
-
-    if "color_diffs_min" in assertions:
-        diffs = color.get("diffs") if color else None
-        if diffs is not None:
-            count = len(diffs)
-            if count < assertions["color_diffs_min"]:
-                failures.append(
-                    format_case_id(case_id, viewport_name)
-                    + f": color diffs {count} < {assertions['color_diffs_min']}"
-                )
-
-    if "similarity_max" in assertions and similarity is not None:
-        if similarity > assertions["similarity_max"]:
-            failures.append(
-                format_case_id(case_id, viewport_name)
-                + f": similarity {similarity:.4f} > {assertions['similarity_max']}"
-            )
+        return [prefix + f": unexpected mode {payload.get('mode')}"]
 
-    if "color_score_max" in assertions:
-        score = color.get("score") if color else None
-        if score is not None and score > assertions["color_score_max"]:
-            failures.append(
-                format_case_id(case_id, viewport_name)
-                + f": color score {score:.4f} > {assertions['color_score_max']}"
-            )
-
-    if "typography_score_max" in assertions:
-        score = typography.get("score") if typography else None
-        if score is not None and score > assertions["typography_score_max"]:
-            failures.append(
-                format_case_id(case_id, viewport_name)
-                + f": typography score {score:.4f} > {assertions['typography_score_max']}"
-            )
+    failures = []
+    metrics = payload.get("metrics") or {}
 
-    if "layout_score_max" in assertions:
-        score = layout.get("score") if layout else None
-        if score is not None and score > assertions["layout_score_max"]:
-            failures.append(
-                format_case_id(case_id, viewport_name)
-                + f": layout score {score:.4f} > {assertions['layout_score_max']}"
-            )
+    for key, metric_name, field, label in COUNT_CHECKS:
+        minimum = assertions.get(key)
+        metric = metrics.get(metric_name)
+        if minimum is None or not metric:
+            continue
+        entries = metric.get(field)
+        if entries is not None and len(entries) < minimum:
+            failures.append(f"{prefix}: {label} {len(entries)} < {minimum}")
 
-    if "content_score_max" in assertions:
-        score = content.get("score") if content else None
-        if score is not None and score > assertions["content_score_max"]:
-            failures.append(
-                format_case_id(case_id, viewport_name)
-                + f": content score {score:.4f} > {assertions['content_score_max']}"
-            )
+    similarity = payload.get("similarity")
+    maximum = assertions.get("similarity_max")
+    if maximum is not None and similarity is not None and similarity > maximum:
+        failures.append(f"{prefix}: similarity {similarity:.4f} > {maximum}")
+
+    for key, metric_name, label in SCORE_CHECKS:
+        maximum = assertions.get(key)
+        metric = metrics.get(metric_name)
+        if maximum is None or not metric:
+            continue
+        score = metric.get("score")
+        if score is not None and score > maximum:
+            failures.append(f"{prefix}: {label} {score:.4f} > {maximum}")
 
     return failures
 
@@ -172,6 +277,115 @@ def format_case_id(case_id, viewport_name):
     return case_id
 
 
+def process_case(
+    case_dir: Path, meta_path: Path, compare, fixtures_src_dir: Path, args
+):
+    meta = loads(meta_path.read_bytes())
+    case_id = meta.get("case_id", case_dir.name)
+    assertions = meta.get("assertions", {})
+    assertions_by_viewport = meta.get("assertions_by_viewport", {})
+    records = []
+    failures = []
+    errors = 0
+
+    is_multi = "viewports" in meta
+    if args.use_html:
+        case_src_dir = fixtures_src_dir / case_dir.name
+        ref_path = case_src_dir / "ref.html"
+        impl_path = case_src_dir / "impl.html"
+        if not ref_path.exists() or not impl_path.exists():
+            failures.append(f"{case_id}: missing HTML source in {case_src_dir}")
+            records.append(
+                {
+                    "case_id": case_id,
+                    "status": "error",
+                    "error": "missing HTML source",
+                }
+            )
+            return case_id, records, failures, 1
+        if is_multi:
+            viewports = meta["viewports"]
+        else:
+            viewports = [meta.get("viewport")] if meta.get("viewport") else []
+    else:
+        viewports = [None]
+
+    if args.use_html:
+        ref_path = ref_path.as_uri()
+        impl_path = impl_path.as_uri()
+
+    # Per-viewport assertions, labels and report meta are settled up front so
+    # the loop below only runs comparisons and records their results.
+    plan = []
+    for vp in viewports:
+        viewport_name = vp.get("name") if isinstance(vp, dict) else None
+        assertions_to_use = assertions_by_viewport.get(viewport_name)
+        if assertions_to_use is None:
+            assertions_to_use = assertions
+        label = format_case_id(case_id, viewport_name)
+        plan.append((vp, viewport_name, label, assertions_to_use))
+    record_meta = {
+        "category": meta.get("category", []),
+        "complexity": meta.get("complexity"),
+        "mutations": meta.get("mutations", []),
+        "expectations": meta.get("expectations", []),
+    }
+
+    for vp, viewport_name, label, assertions_to_use in plan:
+        if args.use_html:
+            viewport_arg = f"{vp['width']}x{vp['height']}" if vp else None
+            ref_input = ref_path
+            impl_input = impl_path
+        else:
+            viewport_arg = None
+            if is_multi:
+                suffix = f".{viewport_name}" if viewport_name else ".desktop"
+                ref_input = fixture_image(case_dir, f"ref{suffix}")
+                impl_input = fixture_image(case_dir, f"impl{suffix}")
+            else:
+                ref_input = fixture_image(case_dir, "ref")
+                impl_input = fixture_image(case_dir, "impl")
+
+        code, payload, stderr = compare(ref_input, impl_input, viewport=viewport_arg)
+        if payload is None:
+            errors += 1
+            failures.append(f"{label}: no JSON output (code {code}) {stderr}")
+            records.append(
+                {
+                    "case_id": case_id,
+                    "viewport": viewport_name,
+                    "status": "error",
+                    "error": stderr or "no json output",
+                }
+            )
+            continue
+
+        case_failures = check_assertions(
+            case_id, payload, assertions_to_use, viewport_name
+        )
+        failures.extend(case_failures)
+        records.append(
+            {
+                "case_id": case_id,
+                "viewport": viewport_name,
+                "status": "ok" if not case_failures else "fail",
+                "failures": case_failures,
+                "assertions": assertions_to_use,
+                "meta": record_meta,
+                "result": payload,
+            }
+        )
+
+    return case_id, records, failures, errors
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run fixture checks with DPC.")
     parser.add_argument(
@@ -211,6 +425,17 @@ def main():
         action="store_true",
         help="Use ref.html/impl.html via Playwright (semantic metrics).",
     )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=os.cpu_count() or 1,
+        help="Number of cases compared concurrently.",
+    )
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="Spawn one dpc compare per case instead of using dpc compare-batch.",
+    )
     parser.add_argument(
         "--strict",
         action="store_true",
@@ -219,7 +444,7 @@ def main():
     args = parser.parse_args()
 
     fixtures_dir = Path(args.fixtures_dir)
-    fixtures_src_dir = Path(args.fixtures_src_dir)
+    fixtures_src_dir = Path(args.fixtures_src_dir).resolve()
     cmd = parse_cmd(args.cmd)
 
     cases = list(load_cases(fixtures_dir))
@@ -231,138 +456,40 @@ def main():
     failures = []
     errors = 0
     total = len(cases)
+    started = datetime.now(timezone.utc)
+    timestamp = started.isoformat()
     if args.report_out:
         report_path = Path(args.report_out)
     else:
-        ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        ts = started.strftime("%Y%m%dT%H%M%SZ")
         report_path = Path("test_assets/reports") / f"fixtures_{ts}.jsonl"
     report_path.parent.mkdir(parents=True, exist_ok=True)
-    report_file = report_path.open("w")
+    report_file = report_path.open("wb", buffering=1 << 20)
     print(f"Report: {report_path}")
 
-    for idx, (case_dir, meta_path) in enumerate(cases, start=1):
-        meta = json.loads(meta_path.read_text())
-        case_id = meta.get("case_id", case_dir.name)
-        assertions = meta.get("assertions", {})
-        assertions_by_viewport = meta.get("assertions_by_viewport", {})
-
-        is_multi = "viewports" in meta
-        if args.use_html:
-            case_src_dir = fixtures_src_dir / case_dir.name
-            ref_path = case_src_dir / "ref.html"
-            impl_path = case_src_dir / "impl.html"
-            if not ref_path.exists() or not impl_path.exists():
-                errors += 1
-                failures.append(
-                    f"{case_id}: missing HTML source in {case_src_dir}"
-                )
-                if report_file:
-                    report_file.write(
-                        json.dumps(
-                            {
-                                "case_id": case_id,
-                                "status": "error",
-                                "error": "missing HTML source",
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
-                            }
-                        )
-                        + "\n"
-                    )
-                continue
-            ref_type = "url"
-            impl_type = "url"
-            if is_multi:
-                viewports = meta["viewports"]
-            else:
-                viewports = [meta.get("viewport")] if meta.get("viewport") else []
-        else:
-            ref_type = None
-            impl_type = None
-            viewports = [None]
-
-        if args.use_html:
-            ref_path = ref_path.resolve().as_uri()
-            impl_path = impl_path.resolve().as_uri()
-
-        print(f"[{idx}/{total}] {case_id}")
-        for vp in viewports:
-            viewport_name = vp.get("name") if isinstance(vp, dict) else None
-            if args.use_html:
-                viewport_arg = (
-                    f"{vp['width']}x{vp['height']}" if vp else None
-                )
-                ref_input = ref_path
-                impl_input = impl_path
-            else:
-                viewport_arg = None
-                if is_multi:
-                    suffix = f".{viewport_name}" if viewport_name else ".desktop"
-                    ref_input = case_dir / f"ref{suffix}.png"
-                    impl_input = case_dir / f"impl{suffix}.png"
-                else:
-                    ref_input = case_dir / "ref.png"
-                    impl_input = case_dir / "impl.png"
-
-            code, payload, stderr = run_compare(
-                cmd,
-                ref_input,
-                impl_input,
-                threshold=args.threshold,
-                ref_type=ref_type,
-                impl_type=impl_type,
-                viewport=viewport_arg,
-            )
-            if payload is None:
-                errors += 1
-                failures.append(
-                    f"{format_case_id(case_id, viewport_name)}: no JSON output (code {code}) {stderr}"
-                )
-                if report_file:
-                    report_file.write(
-                        json.dumps(
-                            {
-                                "case_id": case_id,
-                                "viewport": viewport_name,
-                                "status": "error",
-                                "error": stderr or "no json output",
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
-                            }
-                        )
-                        + "\n"
-                    )
-                continue
-
-            assertions_override = assertions_by_viewport.get(viewport_name)
-            if assertions_override is not None:
-                assertions_to_use = assertions_override
-            else:
-                assertions_to_use = assertions
-
-            case_failures = check_assertions(
-                case_id, payload, assertions_to_use, viewport_name
-            )
+    options = compare_options(args.threshold, "url" if args.use_html else None)
+    if not args.no_batch and supports_batch(cmd):
+        compare = BatchCompare(cmd, options)
+    else:
+        compare = partial(run_compare, (*cmd, "compare"), options)
+
+    # Results come back in submission order and are written from this thread,
+    # which keeps the report and progress output deterministic.
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = pool.map(
+            lambda case: process_case(*case, compare, fixtures_src_dir, args), cases
+        )
+        for idx, (case_id, records, case_failures, case_errors) in enumerate(
+            results, start=1
+        ):
+            print(f"[{idx}/{total}] {case_id}")
+            for record in records:
+                record["timestamp"] = timestamp
+                report_file.write(dumps_line(record))
             failures.extend(case_failures)
-            if report_file:
-                report_file.write(
-                    json.dumps(
-                        {
-                            "case_id": case_id,
-                            "viewport": viewport_name,
-                            "status": "ok" if not case_failures else "fail",
-                            "failures": case_failures,
-                            "assertions": assertions_to_use,
-                            "meta": {
-                                "category": meta.get("category", []),
-                                "complexity": meta.get("complexity"),
-                                "mutations": meta.get("mutations", []),
-                                "expectations": meta.get("expectations", []),
-                            },
-                            "result": payload,
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
-                        }
-                    )
-                    + "\n"
-                )
+            errors += case_errors
+    if isinstance(compare, BatchCompare):
+        compare.close()
 
     print(f"\nTotal: {total}")
     print(f"Failures: {len(failures)}")
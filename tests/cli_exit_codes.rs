@@ -1,7 +1,8 @@
 use dpc_lib::DpcOutput;
 use image::RgbaImage;
 use std::env;
-use std::process::Command;
+use std::io::Write;
+use std::process::{Command, Stdio};
 use tempfile::TempDir;
 
 fn write_image(path: &std::path::Path, color: [u8; 4]) {
@@ -722,3 +723,144 @@ fn compare_pretty_exit_code_returns_fatal_for_invalid_input() {
         .expect("run dpc");
     assert_eq!(status.code(), Some(2));
 }
+
+fn run_compare_batch(requests: &[String]) -> std::process::Output {
+    let mut child = Command::new(env!("CARGO_BIN_EXE_dpc"))
+        .arg("compare-batch")
+        .stdin(Stdio::piped())
+        .stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .spawn()
+        .expect("run dpc compare-batch");
+    {
+        let mut stdin = child.stdin.take().expect("batch stdin");
+        for request in requests {
+            writeln!(stdin, "{request}").expect("write batch request");
+        }
+    }
+    child
+        .wait_with_output()
+        .expect("wait for dpc compare-batch")
+}
+
+fn batch_request(flags: &[&str]) -> String {
+    serde_json::to_string(flags).expect("encode batch request")
+}
+
+fn parse_batch_lines(stdout: &[u8]) -> Vec<serde_json::Value> {
+    String::from_utf8_lossy(stdout)
+        .lines()
+        .map(|line| serde_json::from_str(line).expect("batch output line should be JSON"))
+        .collect()
+}
+
+#[test]
+fn compare_batch_answers_each_request_with_one_json_line() {
+    let dir = TempDir::new().expect("tempdir");
+    let ref_path = dir.path().join("ref.png");
+    let impl_path = dir.path().join("impl.png");
+    let other_path = dir.path().join("other.png");
+    write_image(&ref_path, [10, 20, 30, 255]);
+    write_image(&impl_path, [10, 20, 30, 255]);
+    write_image(&other_path, [255, 255, 255, 255]);
+
+    let output = run_compare_batch(&[
+        batch_request(&[
+            "--ref",
+            ref_path.to_str().unwrap(),
+            "--impl",
+            impl_path.to_str().unwrap(),
+        ]),
+        batch_request(&[
+            "--ref",
+            ref_path.to_str().unwrap(),
+            "--impl",
+            other_path.to_str().unwrap(),
+            "--threshold",
+            "0.99",
+        ]),
+    ]);
+
+    assert_eq!(output.status.code(), Some(0));
+    let lines = parse_batch_lines(&output.stdout);
+    assert_eq!(
+        lines.len(),
+        2,
+        "expected one line per request, got {lines:?}"
+    );
+    for line in &lines {
+        assert_eq!(line.get("mode").and_then(|v| v.as_str()), Some("compare"));
+    }
+    assert_eq!(lines[0].get("passed").and_then(|v| v.as_bool()), Some(true));
+    assert_eq!(
+        lines[1].get("passed").and_then(|v| v.as_bool()),
+        Some(false)
+    );
+}
+
+#[test]
+fn compare_batch_reports_bad_requests_and_keeps_going() {
+    let dir = TempDir::new().expect("tempdir");
+    let ref_path = dir.path().join("ref.png");
+    let impl_path = dir.path().join("impl.png");
+    write_image(&ref_path, [10, 20, 30, 255]);
+    write_image(&impl_path, [10, 20, 30, 255]);
+
+    let output = run_compare_batch(&[
+        "not json".to_string(),
+        batch_request(&[
+            "--ref",
+            ref_path.to_str().unwrap(),
+            "--impl",
+            impl_path.to_str().unwrap(),
+            "--no-such-flag",
+        ]),
+        batch_request(&[
+            "--ref",
+            ref_path.to_str().unwrap(),
+            "--impl",
+            impl_path.to_str().unwrap(),
+        ]),
+    ]);
+
+    assert_eq!(output.status.code(), Some(0));
+    let lines = parse_batch_lines(&output.stdout);
+    let modes: Vec<_> = lines
+        .iter()
+        .map(|line| line.get("mode").and_then(|v| v.as_str()))
+        .collect();
+    assert_eq!(modes, [Some("error"), Some("error"), Some("compare")]);
+}
+
+#[test]
+fn compare_batch_ignores_format_and_output_flags() {
+    let dir = TempDir::new().expect("tempdir");
+    let ref_path = dir.path().join("ref.png");
+    let impl_path = dir.path().join("impl.png");
+    let out_path = dir.path().join("out.txt");
+    write_image(&ref_path, [10, 20, 30, 255]);
+    write_image(&impl_path, [10, 20, 30, 255]);
+
+    let output = run_compare_batch(&[batch_request(&[
+        "--ref",
+        ref_path.to_str().unwrap(),
+        "--impl",
+        impl_path.to_str().unwrap(),
+        "--format",
+        "pretty",
+        "--output",
+        out_path.to_str().unwrap(),
+    ])]);
+
+    assert_eq!(output.status.code(), Some(0));
+    let lines = parse_batch_lines(&output.stdout);
+    assert_eq!(lines.len(), 1, "expected one JSON line, got {lines:?}");
+    assert_eq!(
+        lines[0].get("mode").and_then(|v| v.as_str()),
+        Some("compare")
+    );
+    assert!(
+        !out_path.exists(),
+        "batch results should go to stdout, not --output"
+    );
+}